@@ -0,0 +1,29 @@
+import argparse
+import os
+from src.utils.logger import setup_logger
+from src.config_loader import load_config
+from src.utils.sidecar import sidecar_path_for
+from src.utils.sidecar_renderer import render_sidecar
+
+def main():
+    parser = argparse.ArgumentParser(description="Render annotated video from a source video and its detection sidecar.")
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--source", help="Source video (defaults to io.input_source)")
+    parser.add_argument("--sidecar", help="Sidecar file (defaults to the one next to the source)")
+    parser.add_argument("--output", help="Annotated video path (defaults to io.output_dir)")
+    args = parser.parse_args()
+
+    logger = setup_logger("TrafficSystem")
+    config = load_config(args.config)
+    io_cfg = config['io']
+
+    source = args.source or io_cfg['input_source']
+    out_dir = io_cfg.get('output_dir', 'data/output/')
+    sidecar = args.sidecar or io_cfg.get('sidecar_path') or sidecar_path_for(source)
+    output = args.output or os.path.join(out_dir, "phase1_tracked_output.mp4")
+
+    logger.info("=== Rendering Annotated Video from Detection Sidecar ===")
+    render_sidecar(source, sidecar, output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import copy
+import os
+import multiprocessing as mp
+from src.utils.logger import setup_logger
+from src.config_loader import load_config
+from src.core.inference_server import InferenceServer, InferenceClient
+from src.core.pipeline import TrafficPipeline
+
+def run_worker(config, handle):
+    """Pipeline worker process: decode, logic and output locally, inference via the server."""
+    setup_logger("TrafficSystem")
+    client = InferenceClient(handle)
+    try:
+        TrafficPipeline(config, detector=client).run()
+    finally:
+        client.close()
+
+def worker_config(config, source, index):
+    """Per-camera config: own input source, output directory and sidecar, no display windows."""
+    cfg = copy.deepcopy(config)
+    cfg['io']['input_source'] = source
+    cfg['io']['output_dir'] = os.path.join(config['io'].get('output_dir', 'data/output/'), f"worker_{index}")
+    cfg['io']['show_display'] = False
+    if cfg['io'].get('sidecar_path'):
+        # A shared override would have every worker truncate the same file
+        root, ext = os.path.splitext(cfg['io']['sidecar_path'])
+        cfg['io']['sidecar_path'] = f"{root}.worker_{index}{ext}"
+    return cfg
+
+def main():
+    logger = setup_logger("TrafficSystem")
+    logger.info("=== Starting Shared Inference Server with Pipeline Workers ===")
+
+    config = load_config("config.yaml")
+    server_cfg = config['inference_server']
+    sources = server_cfg.get('sources') or [config['io']['input_source']]
+
+    server = InferenceServer(config['model'], server_cfg)
+    handles = [server.register_client() for _ in sources]
+    server.start()
+
+    workers = [
+        mp.Process(target=run_worker, args=(worker_config(config, src, i), handle), name=f"PipelineWorker-{i}")
+        for i, (src, handle) in enumerate(zip(sources, handles))
+    ]
+    for worker in workers:
+        worker.start()
+
+    try:
+        for worker in workers:
+            worker.join()
+    finally:
+        server.stop()
+
+    failed = [worker for worker in workers if worker.exitcode != 0]
+    for worker in failed:
+        logger.error(f"{worker.name} exited with code {worker.exitcode}")
+    if failed:
+        # Non-zero exit lets supervisors notice a camera that stopped being processed
+        raise SystemExit(1)
+    logger.info("All pipeline workers finished.")
+
+if __name__ == "__main__":
+    main()
@@ -10,15 +10,17 @@ class VehicleDetector:
     Responsible exclusively for detecting and tracking objects statelessly per frame.
     Tracking state is handled natively by YOLO with persist=True.
     """
-    def __init__(self, model_weight, conf_thresh, iou_thresh, target_classes, tracker):
+    def __init__(self, model_weight, conf_thresh, iou_thresh, target_classes, tracker, imgsz=None):
         logger.info(f"Initializing YOLO Model with weights: {model_weight}")
         self.model = YOLO(model_weight)
         self.conf_thresh = conf_thresh
         self.iou_thresh = iou_thresh
         self.target_classes = target_classes
         self.tracker_config = tracker
+        # None keeps the model's native inference size (640 for YOLOv8)
+        self.imgsz = imgsz
         
-        logger.debug(f"Detector Filters -> Conf: {conf_thresh}, Classes: {target_classes}")
+        logger.debug(f"Detector Filters -> Conf: {conf_thresh}, Classes: {target_classes}, Input Size: {imgsz or 'default'}")
 
     def detect_and_track(self, frame):
         """
@@ -27,6 +29,8 @@ class VehicleDetector:
         Returns:
             list of Detection: Standardized detection dataclasses
         """
+        track_kwargs = {"imgsz": self.imgsz} if self.imgsz else {}
+
         # verbose=False prevents YOLO from cluttering the console output on every frame
         results = self.model.track(
             source=frame,
@@ -35,7 +39,8 @@ class VehicleDetector:
             classes=self.target_classes,
             tracker=self.tracker_config,
             persist=True,
-            verbose=False
+            verbose=False,
+            **track_kwargs
         )
 
         detections = []
@@ -0,0 +1,335 @@
+import logging
+import multiprocessing as mp
+import queue
+import time
+from collections import deque
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.models import Detection, BoundingBox
+
+logger = logging.getLogger("TrafficSystem.InferenceServer")
+
+_SHUTDOWN = None
+
+class SharedFrameRing:
+    """
+    Fixed-size ring of frame slots in a shared memory block.
+    Clients copy a frame into a slot once; the server reads it in place, so frame
+    pixels never travel through pickling or a pipe.
+    """
+    def __init__(self, shm: shared_memory.SharedMemory, slots: int, slot_bytes: int, owner: bool):
+        self.shm = shm
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.owner = owner
+
+    @classmethod
+    def create(cls, slots: int, slot_bytes: int) -> "SharedFrameRing":
+        shm = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+        return cls(shm, slots, slot_bytes, owner=True)
+
+    @classmethod
+    def attach(cls, name: str, slots: int, slot_bytes: int) -> "SharedFrameRing":
+        try:
+            # Python 3.13+: keep the resource tracker from unlinking the owner's block
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, slots, slot_bytes, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def write(self, slot: int, frame: np.ndarray) -> Tuple[Tuple[int, ...], str]:
+        """Copies a frame into a slot and returns the (shape, dtype) needed to view it."""
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"Frame of {frame.nbytes} bytes exceeds ring slot size {self.slot_bytes}")
+        self.view(slot, frame.shape, frame.dtype.str)[...] = frame
+        return frame.shape, frame.dtype.str
+
+    def view(self, slot: int, shape, dtype) -> np.ndarray:
+        """Zero-copy ndarray over a slot."""
+        return np.ndarray(shape, dtype=np.dtype(dtype), buffer=self.shm.buf, offset=slot * self.slot_bytes)
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+@dataclass
+class ClientHandle:
+    """Picklable connection details handed to a pipeline worker process."""
+    client_id: int
+    ring_name: str
+    slots: int
+    slot_bytes: int
+    requests: Any   # multiprocessing.Queue shared by all clients
+    responses: Any  # receiving end of this client's multiprocessing.Pipe
+    response_timeout: float = 120.0  # seconds without any reply before the server is presumed hung
+
+class InferenceClient:
+    """
+    Drop-in replacement for VehicleDetector inside a pipeline worker.
+    Frames go through the shared-memory ring; detections come back over a local pipe.
+    """
+    def __init__(self, handle: ClientHandle):
+        self.handle = handle
+        self.ring = SharedFrameRing.attach(handle.ring_name, handle.slots, handle.slot_bytes)
+        self.class_names: Optional[Dict[int, str]] = None
+        self._next_seq = 0
+        self._in_flight = deque()
+        self._ready: Dict[int, List[Detection]] = {}
+
+    def submit(self, frame: np.ndarray) -> int:
+        """
+        Queues a frame for inference without waiting and returns its sequence number.
+        Blocks only when every ring slot is still awaiting a result.
+        """
+        while len(self._in_flight) >= self.handle.slots:
+            self._receive()
+
+        seq = self._next_seq
+        self._next_seq += 1
+        slot = seq % self.handle.slots
+        shape, dtype = self.ring.write(slot, frame)
+        self.handle.requests.put((self.handle.client_id, seq, slot, shape, dtype))
+        self._in_flight.append(seq)
+        return seq
+
+    def result(self, seq: int) -> List[Detection]:
+        """Waits for the detections of a submitted frame."""
+        while seq not in self._ready:
+            self._receive()
+        return self._ready.pop(seq)
+
+    def detect_and_track(self, frame) -> List[Detection]:
+        """Same contract as VehicleDetector.detect_and_track()."""
+        return self.result(self.submit(frame))
+
+    def _receive(self):
+        # Poll instead of a bare recv() so a dead or hung server surfaces as an error
+        conn = self.handle.responses
+        try:
+            ready = conn.poll(self.handle.response_timeout)
+            message = conn.recv() if ready else None
+        except (EOFError, OSError) as e:
+            raise RuntimeError("Inference server exited unexpectedly") from e
+        if not ready:
+            raise TimeoutError(f"No reply from inference server within {self.handle.response_timeout}s")
+        if message[0] == "names":
+            self.class_names = message[1]
+            return
+        if message[0] == "error":
+            raise RuntimeError(f"Inference server failed: {message[1]}")
+
+        _, seq, rows = message
+        self._in_flight.remove(seq)
+        self._ready[seq] = [
+            Detection(
+                class_id=class_id,
+                class_name=self.class_names.get(class_id, str(class_id)) if self.class_names else str(class_id),
+                confidence=conf,
+                bbox=BoundingBox(x1=x1, y1=y1, x2=x2, y2=y2),
+                track_id=track_id
+            )
+            for class_id, conf, x1, y1, x2, y2, track_id in rows
+        ]
+
+    def close(self):
+        self.ring.close()
+
+def collect_batch(requests, max_batch: int, batch_timeout: float) -> Tuple[List[tuple], bool]:
+    """
+    Blocks for the first request, then gathers more for up to batch_timeout seconds.
+
+    Returns:
+        Tuple[List[tuple], bool]: (batch, shutdown_requested)
+    """
+    first = requests.get()
+    if first is _SHUTDOWN:
+        return [], True
+
+    batch = [first]
+    deadline = time.perf_counter() + batch_timeout
+    while len(batch) < max_batch:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            break
+        try:
+            item = requests.get(timeout=remaining)
+        except queue.Empty:
+            break
+        if item is _SHUTDOWN:
+            return batch, True
+        batch.append(item)
+    return batch, False
+
+def _build_tracker(tracker_config, frame_rate=30):
+    """Creates an independent ByteTrack/BoT-SORT instance, as model.track() does internally."""
+    import yaml
+    from ultralytics.trackers.track import TRACKER_MAP
+    from ultralytics.utils import IterableSimpleNamespace
+    from ultralytics.utils.checks import check_yaml
+
+    with open(check_yaml(tracker_config), 'r') as f:
+        cfg = IterableSimpleNamespace(**yaml.safe_load(f))
+    return TRACKER_MAP[cfg.tracker_type](args=cfg, frame_rate=frame_rate)
+
+def _to_rows(tracks) -> List[tuple]:
+    """Tracker output rows (x1, y1, x2, y2, track_id, score, cls, idx) -> wire tuples."""
+    return [
+        (int(t[6]), float(t[5]), int(t[0]), int(t[1]), int(t[2]), int(t[3]), int(t[4]))
+        for t in tracks
+    ]
+
+def _untracked_rows(det) -> List[tuple]:
+    """Raw detections (numpy Boxes) -> wire tuples without a track ID."""
+    return [
+        (int(cls), float(conf), int(x1), int(y1), int(x2), int(y2), None)
+        for (x1, y1, x2, y2), conf, cls in zip(det.xyxy, det.conf, det.cls)
+    ]
+
+def process_batch(model, batch, rings, trackers, tracker_factory, responses, predict_kwargs):
+    """
+    Runs one cross-client batch through the model and routes each result back.
+
+    Results keep batch order, so each client's tracker is updated with that client's
+    frames only, in the order it submitted them.
+
+    Tracker handling mirrors model.track(persist=True): frames without detections do not
+    step the tracker, and when the tracker confirms no tracks the raw detections are
+    returned without track IDs, so clients see exactly what VehicleDetector would return.
+    """
+    frames = [rings[cid].view(slot, shape, dtype) for cid, _, slot, shape, dtype in batch]
+    results = model.predict(frames, **predict_kwargs)
+
+    for (cid, seq, _, _, _), frame, result in zip(batch, frames, results):
+        det = result.boxes.cpu().numpy()
+        if len(det) == 0:
+            responses[cid].send(("result", seq, []))
+            continue
+
+        if cid not in trackers:
+            trackers[cid] = tracker_factory()
+        tracks = trackers[cid].update(det, frame)
+        rows = _to_rows(tracks) if len(tracks) else _untracked_rows(det)
+        responses[cid].send(("result", seq, rows))
+
+def _notify_error(responses, error):
+    for conn in responses.values():
+        try:
+            conn.send(("error", repr(error)))
+        except OSError:
+            pass
+
+def _serve(model_cfg, server_cfg, ring_specs, requests, responses):
+    """Server process entry point: owns the only copy of the model."""
+    rings = {}
+    try:
+        from ultralytics import YOLO
+
+        # The only place weights are loaded; workers hold nothing but their ring and pipe
+        model = YOLO(model_cfg['weights'])
+        rings = {cid: SharedFrameRing.attach(name, slots, slot_bytes) for cid, (name, slots, slot_bytes) in ring_specs.items()}
+        trackers = {}
+        tracker_config = model_cfg.get('tracker', 'bytetrack.yaml')
+        predict_kwargs = {
+            "conf": model_cfg['confidence_threshold'],
+            "iou": model_cfg.get('iou_threshold', 0.45),
+            "classes": model_cfg['target_classes'],
+            "verbose": False,
+        }
+        if model_cfg.get('input_size'):
+            predict_kwargs["imgsz"] = model_cfg['input_size']
+
+        # Fail at startup rather than on the first frame if this ultralytics lacks the tracker API
+        _build_tracker(tracker_config)
+
+        for conn in responses.values():
+            conn.send(("names", dict(model.names)))
+
+        max_batch = server_cfg.get('max_batch', 8)
+        batch_timeout = server_cfg.get('batch_timeout_ms', 5) / 1000.0
+        logger.info(f"Inference server ready for {len(rings)} clients (max batch {max_batch})")
+
+        while True:
+            batch, shutdown = collect_batch(requests, max_batch, batch_timeout)
+            if batch:
+                process_batch(model, batch, rings, trackers, lambda: _build_tracker(tracker_config),
+                              responses, predict_kwargs)
+            if shutdown:
+                break
+    except Exception as e:
+        logger.exception("Inference server crashed")
+        _notify_error(responses, e)
+        raise
+    finally:
+        for ring in rings.values():
+            ring.close()
+        for conn in responses.values():
+            conn.close()
+        logger.info("Inference server stopped.")
+
+class InferenceServer:
+    """
+    Local inference process that owns the single YOLO model for several pipeline workers.
+
+    Each registered client gets its own shared-memory frame ring and response pipe.
+    The server batches pending frames across clients into one predict() call and keeps
+    an independent tracker per client, so track IDs never leak between cameras.
+    """
+    def __init__(self, model_cfg, server_cfg):
+        self.model_cfg = model_cfg
+        self.server_cfg = server_cfg
+        self.requests = mp.Queue()
+        self._rings: Dict[int, SharedFrameRing] = {}
+        self._server_conns = {}
+        self._process = None
+
+    def register_client(self) -> ClientHandle:
+        """Allocates a ring and pipe for one worker. Must be called before start()."""
+        if self._process is not None:
+            raise RuntimeError("Clients must be registered before the inference server starts.")
+
+        client_id = len(self._rings)
+        height, width, channels = self.server_cfg.get('max_frame_shape', [1080, 1920, 3])
+        slots = self.server_cfg.get('ring_slots', 4)
+        ring = SharedFrameRing.create(slots, height * width * channels)
+        recv_conn, send_conn = mp.Pipe(duplex=False)
+
+        self._rings[client_id] = ring
+        self._server_conns[client_id] = send_conn
+        return ClientHandle(client_id, ring.name, slots, ring.slot_bytes, self.requests, recv_conn,
+                            self.server_cfg.get('response_timeout_s', 120.0))
+
+    def start(self):
+        ring_specs = {cid: (r.name, r.slots, r.slot_bytes) for cid, r in self._rings.items()}
+        self._process = mp.Process(
+            target=_serve,
+            args=(self.model_cfg, self.server_cfg, ring_specs, self.requests, self._server_conns),
+            name="InferenceServer",
+            daemon=True
+        )
+        self._process.start()
+
+        # Only the server may hold the sending ends: if it dies, clients get EOF instead of waiting forever
+        for conn in self._server_conns.values():
+            conn.close()
+        logger.info(f"Started inference server process (pid {self._process.pid})")
+
+    def stop(self, timeout=10):
+        if self._process is not None:
+            self.requests.put(_SHUTDOWN)
+            self._process.join(timeout)
+            if self._process.is_alive():
+                logger.warning("Inference server did not stop in time, terminating.")
+                self._process.terminate()
+            self._process = None
+        for ring in self._rings.values():
+            ring.close()
+        self._rings.clear()
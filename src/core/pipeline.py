@@ -7,6 +7,7 @@ from src.core.detector import VehicleDetector
 from src.core.logic_router import VehicleLogicRouter
 from src.core.rider_association import RiderAssociationEngine
 from src.utils.drawing import draw_detections
+from src.utils.sidecar import SidecarWriter, resolve_output_mode, sidecar_path_for
 
 logger = logging.getLogger("TrafficSystem.Pipeline")
 
@@ -14,18 +15,22 @@ class TrafficPipeline:
     """
     Orchestrates the data flow:
     Video Stream -> Vehicle Detection & Tracking -> Annotation -> Video Writer/Display
+
+    With io.output_mode "sidecar", results are persisted as a compact detection sidecar
+    instead of a re-encoded video; render.py produces the annotated video on demand.
     """
-    def __init__(self, config):
+    def __init__(self, config, detector=None):
         self.config = config
         
-        # Instantiate pure perception layer
+        # Instantiate pure perception layer, unless a shared one (e.g. InferenceClient) is injected
         model_cfg = self.config['model']
-        self.detector = VehicleDetector(
+        self.detector = detector if detector is not None else VehicleDetector(
             model_weight=model_cfg['weights'],
             conf_thresh=model_cfg['confidence_threshold'],
             iou_thresh=model_cfg.get('iou_threshold', 0.45),
             target_classes=model_cfg['target_classes'],
-            tracker=model_cfg.get('tracker', 'bytetrack.yaml')
+            tracker=model_cfg.get('tracker', 'bytetrack.yaml'),
+            imgsz=model_cfg.get('input_size')
         )
         
         # Instantiate logical routing layer (Phase 2)
@@ -36,6 +41,102 @@ class TrafficPipeline:
         
         self.io_cfg = self.config['io']
 
+        # Per-stage wall time (seconds) of the most recent process_frame()/write_outputs() calls
+        self.last_stage_latency = {}
+
+        # Output handlers, set up by open_outputs()
+        self.video_out = None
+        self.sidecar = None
+
+    def process_frame(self, frame):
+        """
+        Runs the perception and logic layers on a single frame.
+
+        Returns:
+            tuple: (detections, associations) as produced by the detector and RiderAssociationEngine.
+        """
+        # 1. Detection & Tracking Layer
+        t0 = time.perf_counter()
+        detections = self.detector.detect_and_track(frame)
+        t1 = time.perf_counter()
+
+        # 2. Routing Layer (Phase 2)
+        routed_detections = self.logic_router.route(detections)
+        t2 = time.perf_counter()
+        logger.info("--- Structured Routing Output ---")
+        for category, det_list in routed_detections.items():
+            logger.info(f"{category}: {[f'{d.class_name}(ID:{d.track_id})' for d in det_list]}")
+
+        # 3. Rider Association Layer (Phase 3)
+        t3 = time.perf_counter()
+        associations = self.rider_association.associate(routed_detections)
+        t4 = time.perf_counter()
+        logger.info("--- Rider Association Output ---")
+        for moto_id, data in associations.items():
+            rider_ids_str = f"[{', '.join([f'person(ID:{r.track_id})' for r in data['riders']])}]"
+            logger.info(f"Motorcycle(ID:{moto_id}) -> Riders: {rider_ids_str}")
+
+        self.last_stage_latency = {"detect": t1 - t0, "route": t2 - t1, "associate": t4 - t3}
+        return detections, associations
+
+    def open_outputs(self, source_path, fps, width, height) -> bool:
+        """
+        Sets up the configured output handler (annotated video or detection sidecar).
+
+        Returns:
+            bool: False when io.output_mode is not recognised.
+        """
+        out_dir = self.io_cfg.get('output_dir', 'data/output/')
+        os.makedirs(out_dir, exist_ok=True)
+
+        output_mode = resolve_output_mode(self.io_cfg.get('output_mode', 'video'), source_path)
+        if output_mode == 'sidecar':
+            # Skip video encoding entirely, annotations are rendered offline from the sidecar
+            sidecar_file = self.io_cfg.get('sidecar_path') or sidecar_path_for(source_path)
+            self.sidecar = SidecarWriter(sidecar_file, fps, width, height)
+        elif output_mode == 'video':
+            # Setup Video Writer
+            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+
+            output_file = os.path.join(out_dir, "phase1_tracked_output.mp4")
+            self.video_out = cv2.VideoWriter(output_file, fourcc, fps, (width, height))
+            logger.info(f"Saving output video to: {output_file}")
+        else:
+            logger.error(f"Unknown io.output_mode '{output_mode}', expected 'video' or 'sidecar'.")
+            return False
+        return True
+
+    def write_outputs(self, frame_index, frame, detections, associations, annotate=False):
+        """
+        Annotates and persists one processed frame through the open output handlers.
+
+        Returns:
+            The annotated frame, or None when neither the video writer nor the caller
+            (annotate=True, e.g. for display) needs the pixels.
+        """
+        t0 = time.perf_counter()
+
+        # 4. Annotation Component (only when something will consume the pixels)
+        annotated_frame = None
+        if self.video_out or annotate:
+            annotated_frame = draw_detections(frame.copy(), detections)
+
+        if self.video_out:
+            self.video_out.write(annotated_frame)
+        if self.sidecar:
+            self.sidecar.write_frame(frame_index, detections, associations)
+
+        self.last_stage_latency["output"] = time.perf_counter() - t0
+        return annotated_frame
+
+    def close_outputs(self):
+        if self.video_out:
+            self.video_out.release()
+            self.video_out = None
+        if self.sidecar:
+            self.sidecar.close()
+            self.sidecar = None
+
     def run(self):
         source_path = self.io_cfg['input_source']
         logger.info(f"Starting inference pipeline on source: {source_path}")
@@ -47,20 +148,16 @@ class TrafficPipeline:
             logger.error(f"Cannot initialize video stream from {source_path}")
             return
 
-        out = None
         if self.io_cfg.get('save_results', False):
-            out_dir = self.io_cfg.get('output_dir', 'data/output/')
-            os.makedirs(out_dir, exist_ok=True)
-            
-            # Setup Video Writer
             fps = int(cap.get(cv2.CAP_PROP_FPS)) or 30
             width  = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
             height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            
-            output_file = os.path.join(out_dir, "phase1_tracked_output.mp4")
-            out = cv2.VideoWriter(output_file, fourcc, fps, (width, height))
-            logger.info(f"Saving output video to: {output_file}")
+
+            if not self.open_outputs(source_path, fps, width, height):
+                cap.release()
+                return
+
+        show_display = self.io_cfg.get('show_display', True)
 
         frame_count = 0
         processed_count = 0
@@ -83,24 +180,7 @@ class TrafficPipeline:
                 
             processed_count += 1
 
-            # 1. Detection & Tracking Layer
-            detections = self.detector.detect_and_track(frame)
-
-            # 2. Routing Layer (Phase 2)
-            routed_detections = self.logic_router.route(detections)
-            logger.info("--- Structured Routing Output ---")
-            for category, det_list in routed_detections.items():
-                logger.info(f"{category}: {[f'{d.class_name}(ID:{d.track_id})' for d in det_list]}")
-
-            # 3. Rider Association Layer (Phase 3)
-            associations = self.rider_association.associate(routed_detections)
-            logger.info("--- Rider Association Output ---")
-            for moto_id, data in associations.items():
-                rider_ids_str = f"[{', '.join([f'person(ID:{r.track_id})' for r in data['riders']])}]"
-                logger.info(f"Motorcycle(ID:{moto_id}) -> Riders: {rider_ids_str}")
-
-            # 4. Annotation Component
-            annotated_frame = draw_detections(frame.copy(), detections)
+            detections, associations = self.process_frame(frame)
 
             # Performance & Logging tracker
             if processed_count % 30 == 0:
@@ -109,10 +189,9 @@ class TrafficPipeline:
                 logger.debug(f"Processing... Frame {frame_count}, Tracked Objects: {len(detections)}, Pipeline FPS: {fps_calc:.1f}")
 
             # 3. Output Handlers
-            if out:
-                out.write(annotated_frame)
+            annotated_frame = self.write_outputs(frame_count, frame, detections, associations, annotate=show_display)
 
-            if self.io_cfg.get('show_display', True):
+            if show_display:
                 # Resize for display if frame is huge (e.g. 4k)
                 disp_frame = cv2.resize(annotated_frame, (1280, 720)) if annotated_frame.shape[1] > 1280 else annotated_frame
                 cv2.imshow("Phase 1: Tracked Vehicle Detection", disp_frame)
@@ -124,7 +203,6 @@ class TrafficPipeline:
 
         # Cleanup
         cap.release()
-        if out:
-            out.release()
+        self.close_outputs()
         cv2.destroyAllWindows()
         logger.info("Pipeline closed successfully.")
@@ -0,0 +1,215 @@
+import json
+import math
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Iterable, Optional, Tuple, Sequence
+
+from src.core.models import Detection, BoundingBox
+
+logger = logging.getLogger("TrafficSystem.Metrics")
+
+@dataclass
+class GroundTruthFrame:
+    """
+    Labelled objects of a single frame.
+    rider_pairs holds (person_track_id, motorcycle_track_id) tuples in ground-truth IDs.
+    """
+    objects: List[Detection] = field(default_factory=list)
+    rider_pairs: List[Tuple[int, int]] = field(default_factory=list)
+
+def load_annotations(path) -> Dict[int, GroundTruthFrame]:
+    """
+    Loads ground-truth annotations for a labelled clip.
+
+    Expected JSON layout, keyed by 1-based frame index:
+        {"frames": {"1": [{"track_id": 4, "class_name": "motorcycle", "bbox": [x1, y1, x2, y2]},
+                          {"track_id": 9, "class_name": "person", "bbox": [...], "rides": 4}]}}
+    "rides" names the ground-truth track_id of the motorcycle a person is riding.
+    """
+    with open(path, 'r') as f:
+        raw = json.load(f)
+
+    frames: Dict[int, GroundTruthFrame] = {}
+    for frame_key, objects in raw.get("frames", {}).items():
+        gt_frame = GroundTruthFrame()
+        for obj in objects:
+            x1, y1, x2, y2 = map(int, obj["bbox"])
+            gt_frame.objects.append(Detection(
+                class_id=int(obj.get("class_id", -1)),
+                class_name=obj["class_name"],
+                confidence=1.0,
+                bbox=BoundingBox(x1=x1, y1=y1, x2=x2, y2=y2),
+                track_id=obj.get("track_id")
+            ))
+            if obj.get("rides") is not None:
+                gt_frame.rider_pairs.append((obj.get("track_id"), obj["rides"]))
+        frames[int(frame_key)] = gt_frame
+
+    logger.info(f"Loaded ground truth for {len(frames)} frames from {path}")
+    return frames
+
+def bbox_iou(a: BoundingBox, b: BoundingBox) -> float:
+    """Intersection-over-union of two bounding boxes."""
+    ix1, iy1 = max(a.x1, b.x1), max(a.y1, b.y1)
+    ix2, iy2 = min(a.x2, b.x2), min(a.y2, b.y2)
+    inter = max(0, ix2 - ix1) * max(0, iy2 - iy1)
+    if inter == 0:
+        return 0.0
+    area_a = (a.x2 - a.x1) * (a.y2 - a.y1)
+    area_b = (b.x2 - b.x1) * (b.y2 - b.y1)
+    return inter / float(area_a + area_b - inter)
+
+def match_detections(predictions: List[Detection], ground_truth: List[Detection],
+                     iou_threshold: float = 0.5) -> List[Tuple[int, int]]:
+    """
+    Greedy one-to-one matching of predictions to ground truth of the same class.
+
+    Returns:
+        List[Tuple[int, int]]: (prediction_index, ground_truth_index) pairs, best IoU first.
+    """
+    candidates = []
+    for pi, pred in enumerate(predictions):
+        for gi, gt in enumerate(ground_truth):
+            if pred.class_name.lower() != gt.class_name.lower():
+                continue
+            iou = bbox_iou(pred.bbox, gt.bbox)
+            if iou >= iou_threshold:
+                candidates.append((iou, pi, gi))
+
+    candidates.sort(key=lambda c: c[0], reverse=True)
+    used_pred, used_gt, matches = set(), set(), []
+    for _, pi, gi in candidates:
+        if pi in used_pred or gi in used_gt:
+            continue
+        used_pred.add(pi)
+        used_gt.add(gi)
+        matches.append((pi, gi))
+    return matches
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Linear-interpolated percentile (q in [0, 100]) without a numpy dependency."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100.0
+    lo, hi = math.floor(rank), math.ceil(rank)
+    if lo == hi:
+        return ordered[lo]
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (rank - lo)
+
+def _ratio(num, den):
+    return num / den if den else 0.0
+
+def _f1(p, r):
+    return 2 * p * r / (p + r) if (p + r) else 0.0
+
+# Classes always reported per class, so they can be used as sweep objectives
+# (e.g. "recall.motorcycle") even when a clip happens not to contain them
+REPORTED_CLASSES = ("person", "motorcycle")
+
+class ClipEvaluator:
+    """
+    Accumulates detection, tracking and rider-association accuracy over a labelled clip.
+    Feed it the production outputs (detections + RiderAssociationEngine associations) per frame.
+
+    When classes is given (the trial's target class names), ground-truth objects of other
+    classes are not scored, so a setting is not penalised for classes it was never asked to find.
+    """
+    def __init__(self, iou_threshold: float = 0.5, classes: Optional[Iterable[str]] = None):
+        self.iou_threshold = iou_threshold
+        self.classes = {c.lower() for c in classes} if classes is not None else None
+        self.tp = self.fp = self.fn = 0
+        self.per_class: Dict[str, List[int]] = {}  # class name -> [tp, fp, fn]
+        self.id_switches = 0
+        self.gt_pairs = self.pred_pairs = self.correct_pairs = 0
+        self._last_track_for_gt: Dict[Any, int] = {}
+
+    def _count(self, class_name: str, index: int):
+        self.per_class.setdefault(class_name.lower(), [0, 0, 0])[index] += 1
+
+    def update(self, gt_frame: GroundTruthFrame, detections: List[Detection],
+               associations: Dict[int, Dict[str, Any]]):
+        objects = gt_frame.objects
+        if self.classes is not None:
+            objects = [gt for gt in objects if gt.class_name.lower() in self.classes]
+
+        matches = match_detections(detections, objects, self.iou_threshold)
+        self.tp += len(matches)
+        self.fp += len(detections) - len(matches)
+        self.fn += len(objects) - len(matches)
+
+        matched_pred = {pi for pi, _ in matches}
+        matched_gt = {gi for _, gi in matches}
+        for pi, det in enumerate(detections):
+            self._count(det.class_name, 0 if pi in matched_pred else 1)
+        for gi, gt in enumerate(objects):
+            if gi not in matched_gt:
+                self._count(gt.class_name, 2)
+
+        # Tracking: a ground-truth object picked up by a different predicted ID is a switch
+        gt_to_pred: Dict[int, Detection] = {}
+        for pi, gi in matches:
+            gt = objects[gi]
+            pred = detections[pi]
+            gt_to_pred[gi] = pred
+            if gt.track_id is None or pred.track_id is None:
+                continue
+            previous = self._last_track_for_gt.get(gt.track_id)
+            if previous is not None and previous != pred.track_id:
+                self.id_switches += 1
+            self._last_track_for_gt[gt.track_id] = pred.track_id
+
+        # Rider association: a labelled pair counts when both ends matched and were linked
+        for data in associations.values():
+            self.pred_pairs += len(data["riders"])
+
+        gt_index = {gt.track_id: gi for gi, gt in enumerate(objects) if gt.track_id is not None}
+        self.gt_pairs += len(gt_frame.rider_pairs)
+        for rider_gt_id, moto_gt_id in gt_frame.rider_pairs:
+            if rider_gt_id is None or moto_gt_id is None:
+                continue
+            rider = gt_to_pred.get(gt_index.get(rider_gt_id))
+            moto = gt_to_pred.get(gt_index.get(moto_gt_id))
+            if rider is None or moto is None or moto.track_id not in associations:
+                continue
+            if any(r is rider for r in associations[moto.track_id]["riders"]):
+                self.correct_pairs += 1
+
+    def summary(self) -> Dict[str, float]:
+        precision = _ratio(self.tp, self.tp + self.fp)
+        recall = _ratio(self.tp, self.tp + self.fn)
+        rider_precision = _ratio(self.correct_pairs, self.pred_pairs)
+        rider_recall = _ratio(self.correct_pairs, self.gt_pairs)
+        gt_total = self.tp + self.fn
+        result = {
+            "precision": precision,
+            "recall": recall,
+            "f1": _f1(precision, recall),
+            "mota": 1.0 - _ratio(self.fn + self.fp + self.id_switches, gt_total) if gt_total else 0.0,
+            "id_switches": self.id_switches,
+            "rider_precision": rider_precision,
+            "rider_recall": rider_recall,
+            "rider_f1": _f1(rider_precision, rider_recall),
+        }
+        for name in sorted(set(REPORTED_CLASSES) | set(self.per_class)):
+            tp, fp, fn = self.per_class.get(name, [0, 0, 0])
+            p, r = _ratio(tp, tp + fp), _ratio(tp, tp + fn)
+            result[f"precision.{name}"] = p
+            result[f"recall.{name}"] = r
+            result[f"f1.{name}"] = _f1(p, r)
+        return result
+
+def pareto_frontier(rows: List[Dict[str, Any]], x_key: str = "fps", y_key: str = "f1") -> List[Dict[str, Any]]:
+    """
+    Returns the rows not dominated on (x_key, y_key), both maximized, sorted by x_key.
+    """
+    frontier = []
+    for row in rows:
+        dominated = any(
+            other[x_key] >= row[x_key] and other[y_key] >= row[y_key]
+            and (other[x_key] > row[x_key] or other[y_key] > row[y_key])
+            for other in rows
+        )
+        if not dominated:
+            frontier.append(row)
+    return sorted(frontier, key=lambda r: r[x_key])
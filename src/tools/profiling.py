@@ -0,0 +1,265 @@
+import gc
+import json
+import os
+import sys
+import statistics
+import time
+import tracemalloc
+import logging
+from collections import Counter
+from typing import Dict, List, Any, Iterator, Optional, Sequence, Tuple
+
+from src.tools.metrics import percentile
+
+logger = logging.getLogger("TrafficSystem.Profiling")
+
+def read_rss() -> Tuple[int, bool]:
+    """
+    Resident set size of this process.
+
+    Returns:
+        Tuple[int, bool]: (bytes, is_peak). Linux reports the current RSS from /proc.
+        Elsewhere only getrusage's peak RSS is available; a peak never decreases, so
+        is_peak tells analysis not to read allocator high-water marks as a leak.
+    """
+    try:
+        with open("/proc/self/statm", 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE"), False
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, kilobytes on Linux/BSD
+        return (peak if sys.platform == "darwin" else peak * 1024), True
+
+def object_counts() -> Dict[str, int]:
+    """
+    Live, gc-tracked object counts for every type name.
+    All types are counted (not just the most common) so each type's series stays
+    comparable across samples and slow leaks in rare types remain visible.
+    """
+    return dict(Counter(type(obj).__name__ for obj in gc.get_objects()))
+
+class HeapTracker:
+    """
+    Thin wrapper around tracemalloc that reports the traced heap size and
+    the allocation sites that grew the most since the baseline snapshot.
+
+    Allocations made from the excluded files (the profiler itself, the soak harness)
+    are left out of both numbers, so the measuring code never shows up as a leak.
+    """
+    def __init__(self, frames: int = 1, exclude: Sequence[str] = ()):
+        self.frames = frames
+        self._filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, __file__),
+        ] + [tracemalloc.Filter(False, path) for path in exclude]
+        self._baseline = None
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(self._filters)
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self._baseline = self._snapshot()
+
+    def stop(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._baseline = None
+
+    def sample(self, top: int = 10) -> Dict[str, Any]:
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = self._snapshot()
+        traced = sum(stat.size for stat in snapshot.statistics("filename"))
+        growth = []
+        if self._baseline is not None:
+            for stat in snapshot.compare_to(self._baseline, "lineno")[:top]:
+                frame = stat.traceback[0]
+                growth.append({
+                    "site": f"{frame.filename}:{frame.lineno}",
+                    "size_diff": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                })
+        return {"traced_bytes": traced, "traced_peak_bytes": peak, "top_growth": growth}
+
+class SoakRunner:
+    """
+    Drives a pipeline's process_frame() as fast as possible for a simulated duration
+    and samples memory, heap, object counts and per-stage latency percentiles over time.
+    With exercise_outputs, every processed frame also goes through write_outputs(), so the
+    annotation and video/sidecar writers are soaked along with perception.
+
+    Samples are streamed to a JSONL file and only the latest one is kept in memory,
+    so the harness does not grow inside the process it is measuring.
+    """
+    def __init__(self, pipeline, frames: Iterator[Any], source_fps: float,
+                 sample_every: int = 500, track_heap: bool = True, heap_exclude: Sequence[str] = (),
+                 exercise_outputs: bool = False):
+        self.pipeline = pipeline
+        self.exercise_outputs = exercise_outputs
+        self.frames = frames
+        self.source_fps = source_fps
+        self.sample_every = sample_every
+        self.heap = HeapTracker(exclude=heap_exclude) if track_heap else None
+        self.last_sample: Optional[Dict[str, Any]] = None
+        self.samples_taken = 0
+
+    def run(self, simulated_hours: float, samples_path: str) -> int:
+        """Runs the soak and returns the number of samples written to samples_path."""
+        total_frames = int(simulated_hours * 3600 * self.source_fps)
+        frame_skip = self.pipeline.io_cfg.get('frame_skip', 1)
+        logger.info(f"Soaking {total_frames} frames ({simulated_hours}h of footage at {self.source_fps:.0f} FPS)")
+
+        if self.heap:
+            self.heap.start()
+
+        window: Dict[str, List[float]] = {}
+        start = time.perf_counter()
+        try:
+            with open(samples_path, 'w') as sink:
+                for frame_count in range(1, total_frames + 1):
+                    frame = next(self.frames)
+                    if frame_count % frame_skip == 0:
+                        detections, associations = self.pipeline.process_frame(frame)
+                        if self.exercise_outputs:
+                            self.pipeline.write_outputs(frame_count, frame, detections, associations)
+                        for stage, seconds in self.pipeline.last_stage_latency.items():
+                            window.setdefault(stage, []).append(seconds)
+
+                    if frame_count % self.sample_every == 0:
+                        # Drop the previous sample before measuring so it is not counted
+                        self.last_sample = None
+                        sample = self._sample(frame_count, time.perf_counter() - start, window)
+                        window = {}
+                        sink.write(json.dumps(sample) + "\n")
+                        sink.flush()
+                        self.last_sample = sample
+                        self.samples_taken += 1
+                        logger.info(
+                            f"Soak frame {frame_count}/{total_frames} | "
+                            f"RSS: {sample['rss_bytes'] / 2**20:.1f} MiB | "
+                            f"Heap: {sample['traced_bytes'] / 2**20:.1f} MiB | "
+                            f"Detect p95: {1000 * sample['latency_p95'].get('detect', 0.0):.1f} ms | "
+                            f"Speed-up: {sample['speedup']:.1f}x"
+                        )
+        finally:
+            if self.heap:
+                self.heap.stop()
+
+        return self.samples_taken
+
+    def _sample(self, frame_count, elapsed, window) -> Dict[str, Any]:
+        # Collect first so counts reflect live objects rather than pending garbage
+        gc.collect()
+        heap = self.heap.sample() if self.heap else {"traced_bytes": 0, "traced_peak_bytes": 0, "top_growth": []}
+        rss, rss_is_peak = read_rss()
+        return {
+            "frame": frame_count,
+            "footage_seconds": frame_count / self.source_fps,
+            "wall_seconds": elapsed,
+            "speedup": (frame_count / self.source_fps) / elapsed if elapsed else 0.0,
+            "rss_bytes": rss,
+            "rss_is_peak": rss_is_peak,
+            "traced_bytes": heap["traced_bytes"],
+            "traced_peak_bytes": heap["traced_peak_bytes"],
+            "top_growth": heap["top_growth"],
+            "objects": object_counts(),
+            "latency_p50": {stage: percentile(v, 50) for stage, v in window.items()},
+            "latency_p95": {stage: percentile(v, 95) for stage, v in window.items()},
+            "latency_p99": {stage: percentile(v, 99) for stage, v in window.items()},
+        }
+
+def load_samples(path) -> List[Dict[str, Any]]:
+    """Reads a soak JSONL file back for analysis once the measured run is over."""
+    with open(path, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def detect_growth(values: Sequence[float], min_relative_growth: float = 0.05,
+                  min_monotonic_fraction: float = 0.7, min_samples: int = 6) -> Dict[str, Any]:
+    """
+    Flags sustained upward trends in a metric sampled over time (RSS, heap, latency).
+
+    The series is flagged when the median of its last quarter exceeds the median of its
+    first quarter by min_relative_growth AND at least min_monotonic_fraction of the
+    consecutive steps are non-decreasing. The quarter medians make single spikes
+    (GC pauses, decoder hiccups) harmless while slow leaks still stand out.
+    Leading zeros (e.g. an object type that did not exist yet) are dropped, so a
+    one-off appearance is judged on its own trend rather than as growth from nothing.
+    """
+    values = list(values)
+    first_nonzero = next((i for i, v in enumerate(values) if v), len(values))
+    values = values[first_nonzero:]
+    result = {"flagged": False, "relative_growth": 0.0, "monotonic_fraction": 0.0, "slope": 0.0}
+    if len(values) < min_samples:
+        return result
+
+    quarter = max(1, len(values) // 4)
+    head = statistics.median(values[:quarter])
+    tail = statistics.median(values[-quarter:])
+    steps = list(zip(values, values[1:]))
+    non_decreasing = sum(1 for a, b in steps if b >= a)
+
+    # Least-squares slope in units per sample
+    xs = range(len(values))
+    x_mean = (len(values) - 1) / 2.0
+    y_mean = statistics.fmean(values)
+    denom = sum((x - x_mean) ** 2 for x in xs)
+    slope = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, values)) / denom if denom else 0.0
+
+    result["relative_growth"] = (tail - head) / head if head else 0.0
+    result["monotonic_fraction"] = non_decreasing / len(steps)
+    result["slope"] = slope
+    result["flagged"] = (
+        slope > 0
+        and result["relative_growth"] >= min_relative_growth
+        and result["monotonic_fraction"] >= min_monotonic_fraction
+    )
+    return result
+
+def analyze_samples(samples: List[Dict[str, Any]], warmup_samples: int = 2,
+                    memory_growth: float = 0.05, latency_drift: float = 0.2,
+                    object_growth: float = 0.1) -> List[Dict[str, Any]]:
+    """
+    Scans the soak time series for leaks and drift.
+
+    Args:
+        samples (List[Dict]): Periodic samples with "rss_bytes" (and "rss_is_peak"),
+            "traced_bytes", "objects" (type -> count) and "latency_p95" (stage -> seconds).
+        warmup_samples (int): Leading samples ignored (model warm-up, tracker allocation).
+
+    Returns:
+        List[Dict]: One finding per flagged series, with its trend statistics.
+    """
+    series = samples[warmup_samples:]
+    findings = []
+
+    def check(metric, values, **kwargs):
+        trend = detect_growth(values, **kwargs)
+        if trend["flagged"]:
+            findings.append({"metric": metric, **trend})
+
+    # A peak RSS only ever rises, so it cannot tell a leak from allocator high-water growth
+    if not any(s.get("rss_is_peak") for s in series):
+        check("rss_bytes", [s["rss_bytes"] for s in series], min_relative_growth=memory_growth)
+    check("traced_bytes", [s["traced_bytes"] for s in series], min_relative_growth=memory_growth)
+
+    type_names = set()
+    for s in series:
+        type_names.update(s.get("objects", {}).keys())
+    for name in sorted(type_names):
+        check(f"objects.{name}", [s.get("objects", {}).get(name, 0) for s in series],
+              min_relative_growth=object_growth)
+
+    # Latency percentiles are noisier than memory, so demand less monotonicity
+    stages = set()
+    for s in series:
+        stages.update(s.get("latency_p95", {}).keys())
+    for stage in sorted(stages):
+        check(f"latency_p95.{stage}", [s.get("latency_p95", {}).get(stage, 0.0) for s in series],
+              min_relative_growth=latency_drift, min_monotonic_fraction=0.55)
+
+    return findings
@@ -0,0 +1,203 @@
+import argparse
+import copy
+import csv
+import itertools
+import json
+import os
+import time
+import logging
+from typing import Callable, Dict, Iterable, Iterator, List, Any
+
+from src.config_loader import load_config
+from src.core.logic_router import VehicleLogicRouter
+from src.core.rider_association import RiderAssociationEngine
+from src.tools.metrics import ClipEvaluator, load_annotations, pareto_frontier, percentile
+from src.utils.logger import setup_logger
+
+logger = logging.getLogger("TrafficSystem.Sweep")
+
+# Grid keys living under io: in config.yaml; everything else is a model: setting
+IO_KEYS = {"frame_skip"}
+STAGES = ("decode", "detect", "route", "associate")
+
+def expand_grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Cartesian product of the sweep grid, e.g. {"a": [1, 2], "b": [3]} -> [{a:1,b:3}, {a:2,b:3}]."""
+    keys = list(grid.keys())
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+def apply_settings(config, settings):
+    """Returns a copy of the base config with one grid point applied."""
+    cfg = copy.deepcopy(config)
+    for key, value in settings.items():
+        section = 'io' if key in IO_KEYS else 'model'
+        cfg[section][key] = value
+    return cfg
+
+def build_detector(config):
+    """The production VehicleDetector for one trial's model settings."""
+    # Imported here so the sweep bookkeeping stays usable without ultralytics
+    from src.core.detector import VehicleDetector
+
+    model_cfg = config['model']
+    return VehicleDetector(
+        model_weight=model_cfg['weights'],
+        conf_thresh=model_cfg['confidence_threshold'],
+        iou_thresh=model_cfg.get('iou_threshold', 0.45),
+        target_classes=model_cfg['target_classes'],
+        tracker=model_cfg.get('tracker', 'bytetrack.yaml'),
+        imgsz=model_cfg.get('input_size')
+    )
+
+def clip_frames(clip_path) -> Iterator[Any]:
+    """Yields the frames of a video file once, in order."""
+    import cv2
+
+    cap = cv2.VideoCapture(clip_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Cannot open labelled clip {clip_path}")
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                return
+            yield frame
+    finally:
+        cap.release()
+
+def run_trial(config, frames: Iterable[Any], ground_truth, iou_match=0.5, max_frames=None,
+              detector=None, warmup_frames=1) -> Dict[str, Any]:
+    """
+    Runs the production perception path over the clip frames with one configuration.
+
+    Skipped frames (io.frame_skip) are scored against the most recent processed output,
+    which is what downstream consumers would hold at that moment.
+
+    FPS covers decode, detect, route and associate only. Scoring is excluded, as are all
+    frames up to and including the first warmup_frames inferences, which pay for lazy
+    model initialisation rather than steady-state throughput.
+    """
+    model_cfg = config['model']
+    if detector is None:
+        detector = build_detector(config)
+    logic_router = VehicleLogicRouter()
+    rider_association = RiderAssociationEngine()
+    # Only score ground truth of the classes this trial was asked to detect
+    target_names = [detector.model.names[c] for c in model_cfg['target_classes']]
+    evaluator = ClipEvaluator(iou_threshold=iou_match, classes=target_names)
+    frame_skip = config['io'].get('frame_skip', 1)
+
+    latencies: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    detections, associations = [], {}
+    frame_count = 0
+    inferences = 0
+    timed_frames = 0
+    frame_iter = iter(frames)
+
+    while max_frames is None or frame_count < max_frames:
+        t0 = time.perf_counter()
+        frame = next(frame_iter, None)
+        if frame is None:
+            break
+        stage_times = {"decode": time.perf_counter() - t0}
+        frame_count += 1
+
+        if frame_count % frame_skip == 0:
+            t1 = time.perf_counter()
+            detections = detector.detect_and_track(frame)
+            t2 = time.perf_counter()
+            routed_detections = logic_router.route(detections)
+            t3 = time.perf_counter()
+            associations = rider_association.associate(routed_detections)
+            t4 = time.perf_counter()
+            stage_times.update(detect=t2 - t1, route=t3 - t2, associate=t4 - t3)
+            inferences += 1
+
+        if inferences > warmup_frames:
+            for stage, value in stage_times.items():
+                latencies[stage].append(value)
+            timed_frames += 1
+
+        if frame_count in ground_truth:
+            evaluator.update(ground_truth[frame_count], detections, associations)
+
+    busy = sum(sum(values) for values in latencies.values())
+    result: Dict[str, Any] = {
+        "frames": frame_count,
+        "fps": timed_frames / busy if busy else 0.0,
+    }
+    for stage, values in latencies.items():
+        result[f"{stage}_ms_mean"] = 1000 * sum(values) / len(values) if values else 0.0
+        result[f"{stage}_ms_p95"] = 1000 * percentile(values, 95)
+    result.update(evaluator.summary())
+    return result
+
+def run_sweep(config, clip_path, annotations_path, grid, objective="f1", iou_match=0.5, max_frames=None,
+              detector_factory: Callable = build_detector, frame_source: Callable = clip_frames):
+    """
+    Evaluates every grid point and returns (all_rows, pareto_rows) over (fps, objective).
+    Each trial gets a fresh detector (and tracker state) from detector_factory(trial_config).
+    """
+    ground_truth = load_annotations(annotations_path)
+    rows = []
+    points = expand_grid(grid)
+    for idx, settings in enumerate(points, start=1):
+        logger.info(f"[{idx}/{len(points)}] Trial settings: {settings}")
+        trial_config = apply_settings(config, settings)
+        result = run_trial(trial_config, frame_source(clip_path), ground_truth, iou_match, max_frames,
+                           detector=detector_factory(trial_config))
+        row = {"settings": settings, **result}
+        logger.info(f"FPS: {row['fps']:.1f} | F1: {row['f1']:.3f} | MOTA: {row['mota']:.3f} | Rider F1: {row['rider_f1']:.3f}")
+        rows.append(row)
+    return rows, pareto_frontier(rows, x_key="fps", y_key=objective)
+
+def write_report(rows, frontier, out_dir):
+    """Writes the full sweep table (CSV) and the Pareto frontier (JSON)."""
+    os.makedirs(out_dir, exist_ok=True)
+    csv_path = os.path.join(out_dir, "sweep_results.csv")
+    frontier_path = os.path.join(out_dir, "sweep_pareto.json")
+
+    # Per-class columns depend on each trial's target classes, so take the union
+    fieldnames = ["settings"]
+    for row in rows:
+        fieldnames += [k for k in row.keys() if k not in fieldnames]
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, restval="")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({**row, "settings": json.dumps(row["settings"])})
+
+    with open(frontier_path, 'w') as f:
+        json.dump(frontier, f, indent=2)
+
+    logger.info(f"Sweep table written to {csv_path}, Pareto frontier to {frontier_path}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Accuracy-versus-throughput sweep over detector and pipeline settings.")
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--max-frames", type=int, default=None, help="Limit frames per trial")
+    args = parser.parse_args()
+
+    setup_logger("TrafficSystem")
+    config = load_config(args.config)
+    sweep_cfg = config['sweep']
+
+    objective = sweep_cfg.get('objective', 'f1')
+
+    rows, frontier = run_sweep(
+        config,
+        clip_path=sweep_cfg['clip'],
+        annotations_path=sweep_cfg['annotations'],
+        grid=sweep_cfg['grid'],
+        objective=objective,
+        iou_match=sweep_cfg.get('iou_match', 0.5),
+        max_frames=args.max_frames
+    )
+
+    logger.info(f"--- Pareto Frontier (FPS vs {objective}) ---")
+    for row in frontier:
+        logger.info(f"FPS: {row['fps']:.1f} | {objective}: {row[objective]:.3f} | {row['settings']}")
+
+    write_report(rows, frontier, sweep_cfg.get('output_dir', config['io'].get('output_dir', 'data/output/')))
+
+if __name__ == "__main__":
+    main()
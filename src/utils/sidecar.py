@@ -0,0 +1,232 @@
+import os
+import struct
+import logging
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+from src.core.models import Detection, BoundingBox
+
+logger = logging.getLogger("TrafficSystem.Sidecar")
+
+# File layout (little-endian, append-only):
+#   Header : magic(4s) version(H) fps(f) width(I) height(I)
+#   Records: tag(1s) followed by a tag specific payload
+#     b"C" class name  -> class_id(H) name_len(H) name(utf-8)
+#     b"F" frame       -> frame_index(I) n_detections(H) n_pairs(H)
+#                         n_detections x track_id(i) class_id(H) conf(f) x1 y1 x2 y2(4i)
+#                         n_pairs x moto_index(H) rider_index(H)
+# A motorcycle without riders is stored as a single pair with rider_index 0xFFFF.
+# Class names are written once, the first time a class_id is seen, so frame
+# records stay fixed-width per detection. Association pairs index into the
+# detection list of the same frame, which keeps riders without a track_id intact.
+MAGIC = b"TRSC"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHfII")
+_TAG = struct.Struct("<c")
+_CLASS = struct.Struct("<HH")
+_FRAME = struct.Struct("<IHH")
+_DETECTION = struct.Struct("<iHf4i")
+_PAIR = struct.Struct("<HH")
+
+_NO_TRACK = -1
+_NO_RIDER = 0xFFFF
+
+# Sentinel returned by SidecarReader._read_record for class-name records
+_CLASS_RECORD = object()
+
+
+def is_live_source(source) -> bool:
+    """Camera indices (e.g. 0) are live streams: their frames are never stored anywhere."""
+    return str(source).isdigit()
+
+
+def resolve_output_mode(output_mode, source):
+    """
+    Returns the output mode to actually use for a source.
+    A sidecar is only useful next to a stored video it can be rendered over, so live
+    camera sources fall back to encoding the annotated video directly.
+    """
+    if output_mode == 'sidecar' and is_live_source(source):
+        logger.warning(f"io.output_mode 'sidecar' needs a video file; live camera {source} falls back to 'video'.")
+        return 'video'
+    return output_mode
+
+
+def sidecar_path_for(source):
+    """Resolves the sidecar location for a video file: next to the file itself."""
+    if is_live_source(source):
+        raise ValueError(f"Live camera source {source} has no stored video to place a sidecar next to.")
+    return os.path.splitext(str(source))[0] + ".sidecar.bin"
+
+
+class SidecarWriter:
+    """
+    Appends per-frame detections, tracks and rider associations to a compact binary file.
+    Replaces full video re-encoding; annotated video can be rendered later on demand.
+    """
+    def __init__(self, path, fps, width, height, flush_every=30):
+        self.path = path
+        self.flush_every = flush_every
+        self._known_classes = set()
+        self._frames_written = 0
+
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+
+        self._fh = open(path, "wb")
+        self._fh.write(_HEADER.pack(MAGIC, VERSION, float(fps), int(width), int(height)))
+        logger.info(f"Writing detection sidecar to: {path}")
+
+    def write_frame(self, frame_index: int, detections: List[Detection],
+                    associations: Dict[int, Dict[str, Any]]):
+        """
+        Appends one processed frame.
+
+        Args:
+            frame_index (int): 1-based index of the frame in the source stream.
+            detections (List[Detection]): Output of the detection & tracking layer.
+            associations (Dict[int, Dict[str, Any]]): Output of RiderAssociationEngine.
+        """
+        chunks = []
+        for det in detections:
+            if det.class_id not in self._known_classes:
+                name = det.class_name.encode("utf-8")
+                chunks.append(_TAG.pack(b"C") + _CLASS.pack(det.class_id, len(name)) + name)
+                self._known_classes.add(det.class_id)
+
+        # Associations reference detections by position (identity), not by equality
+        positions = {id(det): idx for idx, det in enumerate(detections)}
+        pairs = []
+        for data in associations.values():
+            moto_idx = positions.get(id(data["motorcycle"]))
+            if moto_idx is None:
+                continue
+            if not data["riders"]:
+                pairs.append((moto_idx, _NO_RIDER))
+            for rider in data["riders"]:
+                rider_idx = positions.get(id(rider))
+                if rider_idx is not None:
+                    pairs.append((moto_idx, rider_idx))
+
+        chunks.append(_TAG.pack(b"F") + _FRAME.pack(frame_index, len(detections), len(pairs)))
+        for det in detections:
+            track_id = det.track_id if det.track_id is not None else _NO_TRACK
+            chunks.append(_DETECTION.pack(
+                track_id, det.class_id, det.confidence,
+                det.bbox.x1, det.bbox.y1, det.bbox.x2, det.bbox.y2
+            ))
+        for moto_idx, rider_idx in pairs:
+            chunks.append(_PAIR.pack(moto_idx, rider_idx))
+
+        self._fh.write(b"".join(chunks))
+        self._frames_written += 1
+        if self.flush_every and self._frames_written % self.flush_every == 0:
+            self._fh.flush()
+
+    def close(self):
+        if not self._fh.closed:
+            self._fh.close()
+            logger.info(f"Sidecar closed after {self._frames_written} frames.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class SidecarReader:
+    """
+    Reads a sidecar file produced by SidecarWriter.
+    A truncated trailing record (e.g. after a crash) is ignored rather than raised.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError(f"Sidecar file {path} is missing its header.")
+
+        magic, version, fps, width, height = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a detection sidecar file.")
+        if version != VERSION:
+            raise ValueError(f"Unsupported sidecar version {version} in {path}.")
+
+        self.fps = fps
+        self.width = width
+        self.height = height
+        self.class_names: Dict[int, str] = {}
+
+    def frames(self) -> Iterator[Tuple[int, List[Detection], Dict[int, Dict[str, Any]]]]:
+        """
+        Yields (frame_index, detections, associations) in the order they were written.
+        Associations follow the same schema as RiderAssociationEngine.associate().
+        Records are streamed one at a time, so memory use is independent of file size.
+        """
+        with open(self.path, "rb") as f:
+            f.seek(_HEADER.size)
+            while True:
+                record_start = f.tell()
+                tag = f.read(_TAG.size)
+                if not tag:
+                    return
+                parsed = self._read_record(f, tag, record_start)
+                if parsed is None:
+                    logger.warning(f"Ignoring truncated trailing record in {self.path}")
+                    return
+                if parsed is not _CLASS_RECORD:
+                    yield parsed
+
+    @staticmethod
+    def _read_exact(f, size) -> Optional[bytes]:
+        chunk = f.read(size)
+        return chunk if len(chunk) == size else None
+
+    def _read_record(self, f, tag, record_start) -> Any:
+        """
+        Reads the payload following a tag.
+        Returns None on a truncated record, _CLASS_RECORD for class-name records,
+        otherwise the decoded (frame_index, detections, associations) tuple.
+        """
+        if tag == b"C":
+            head = self._read_exact(f, _CLASS.size)
+            if head is None:
+                return None
+            class_id, name_len = _CLASS.unpack(head)
+            name = self._read_exact(f, name_len)
+            if name is None:
+                return None
+            self.class_names[class_id] = name.decode("utf-8")
+            return _CLASS_RECORD
+
+        if tag == b"F":
+            head = self._read_exact(f, _FRAME.size)
+            if head is None:
+                return None
+            frame_index, n_dets, n_pairs = _FRAME.unpack(head)
+            body = self._read_exact(f, n_dets * _DETECTION.size + n_pairs * _PAIR.size)
+            if body is None:
+                return None
+
+            detections = []
+            for track_id, class_id, conf, x1, y1, x2, y2 in _DETECTION.iter_unpack(body[:n_dets * _DETECTION.size]):
+                detections.append(Detection(
+                    class_id=class_id,
+                    class_name=self.class_names.get(class_id, str(class_id)),
+                    confidence=conf,
+                    bbox=BoundingBox(x1=x1, y1=y1, x2=x2, y2=y2),
+                    track_id=None if track_id == _NO_TRACK else track_id
+                ))
+
+            associations: Dict[int, Dict[str, Any]] = {}
+            for moto_idx, rider_idx in _PAIR.iter_unpack(body[n_dets * _DETECTION.size:]):
+                moto = detections[moto_idx]
+                entry = associations.setdefault(moto.track_id, {"motorcycle": moto, "riders": []})
+                if rider_idx != _NO_RIDER:
+                    entry["riders"].append(detections[rider_idx])
+
+            return frame_index, detections, associations
+
+        raise ValueError(f"Corrupt sidecar record tag {tag!r} at offset {record_start} in {self.path}")
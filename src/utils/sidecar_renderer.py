@@ -0,0 +1,55 @@
+import cv2
+import os
+import logging
+
+from src.utils.drawing import draw_detections
+from src.utils.sidecar import SidecarReader, is_live_source
+
+logger = logging.getLogger("TrafficSystem.SidecarRenderer")
+
+def render_sidecar(source_path, sidecar_path, output_file):
+    """
+    Produces the annotated video offline from the original source and its detection sidecar.
+    Only frames that were processed by the pipeline (see io.frame_skip) are written,
+    matching what the live video output mode would have produced.
+    """
+    if is_live_source(source_path):
+        # Opening the camera would draw old detections over unrelated live frames
+        raise ValueError(f"Cannot render a sidecar over live camera source {source_path}; a video file is required.")
+
+    reader = SidecarReader(sidecar_path)
+    cap = cv2.VideoCapture(source_path)
+    if not cap.isOpened():
+        logger.error(f"Cannot open source video {source_path}")
+        return False
+
+    out_dir = os.path.dirname(output_file)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    out = cv2.VideoWriter(output_file, fourcc, int(reader.fps) or 30, (reader.width, reader.height))
+    logger.info(f"Rendering {sidecar_path} over {source_path} -> {output_file}")
+
+    frame_count = 0
+    rendered = 0
+    for frame_index, detections, _ in reader.frames():
+        # Advance the source to the recorded frame; grab() skips decoding into a buffer
+        while frame_count < frame_index - 1:
+            if not cap.grab():
+                break
+            frame_count += 1
+
+        ret, frame = cap.read()
+        if not ret:
+            logger.warning(f"Source ended before sidecar frame {frame_index}.")
+            break
+        frame_count += 1
+
+        out.write(draw_detections(frame, detections))
+        rendered += 1
+
+    cap.release()
+    out.release()
+    logger.info(f"Rendered {rendered} annotated frames.")
+    return True
@@ -0,0 +1,249 @@
+import multiprocessing as mp
+import queue
+import threading
+from types import SimpleNamespace
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.core.inference_server import (
+    ClientHandle, InferenceClient, SharedFrameRing, _build_tracker, _serve, collect_batch, process_batch
+)
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing.create(slots=2, slot_bytes=48 * 64 * 3)
+    yield ring
+    ring.close()
+
+def test_ring_round_trip_is_zero_copy(ring):
+    frame = np.random.default_rng(0).integers(0, 255, size=(48, 64, 3), dtype=np.uint8)
+    shape, dtype = ring.write(1, frame)
+
+    reader = SharedFrameRing.attach(ring.name, ring.slots, ring.slot_bytes)
+    view = reader.view(1, shape, dtype)
+    assert np.array_equal(view, frame)
+
+    # Writes by the owner are visible through the attached view without copying
+    ring.write(1, np.zeros_like(frame))
+    assert not view.any()
+    del view
+    reader.close()
+
+def test_ring_rejects_oversized_frame(ring):
+    with pytest.raises(ValueError):
+        ring.write(0, np.zeros((100, 100, 3), dtype=np.uint8))
+
+def test_collect_batch_respects_max_batch_and_shutdown():
+    requests = queue.Queue()
+    for i in range(5):
+        requests.put((0, i, 0, (1,), "|u1"))
+
+    batch, shutdown = collect_batch(requests, max_batch=3, batch_timeout=0.05)
+    assert [item[1] for item in batch] == [0, 1, 2] and not shutdown
+
+    requests.put(None)
+    batch, shutdown = collect_batch(requests, max_batch=8, batch_timeout=0.05)
+    assert [item[1] for item in batch] == [3, 4] and shutdown
+
+def test_client_round_trip_through_ring(ring):
+    requests = queue.Queue()
+    recv_conn, send_conn = mp.Pipe(duplex=False)
+    handle = ClientHandle(0, ring.name, ring.slots, ring.slot_bytes, requests, recv_conn)
+
+    def fake_server():
+        # Echoes the mean pixel value back as the detection confidence
+        send_conn.send(("names", {3: "motorcycle"}))
+        for _ in range(3):
+            cid, seq, slot, shape, dtype = requests.get()
+            frame = ring.view(slot, shape, dtype)
+            send_conn.send(("result", seq, [(3, float(frame.mean()), 1, 2, 3, 4, 10 + seq)]))
+
+    server = threading.Thread(target=fake_server)
+    server.start()
+
+    client = InferenceClient(handle)
+    results = [client.detect_and_track(np.full((48, 64, 3), value, dtype=np.uint8)) for value in (7, 8, 9)]
+    server.join()
+    client.close()
+
+    assert [r[0].confidence for r in results] == [7.0, 8.0, 9.0]
+    assert [r[0].track_id for r in results] == [10, 11, 12]
+    assert results[0][0].class_name == "motorcycle"
+    assert results[0][0].bbox.x2 == 3
+
+class StubBoxes:
+    """Numpy-side Boxes: rows of (x1, y1, x2, y2, conf, cls)."""
+    def __init__(self, data):
+        self.data = np.asarray(data, dtype=np.float32).reshape(-1, 6)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def xyxy(self):
+        return self.data[:, :4]
+
+    @property
+    def conf(self):
+        return self.data[:, 4]
+
+    @property
+    def cls(self):
+        return self.data[:, 5]
+
+class StubResult:
+    def __init__(self, value):
+        # A fill value of 0 is an empty frame; anything else is one box at x1 = value
+        self.boxes = StubBoxes([[value, 0, value + 10, 10, 0.5, 3]] if value else [])
+
+class StubModel:
+    """Batched predict() whose 'detection' for a frame is its fill value."""
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict(self, frames, **kwargs):
+        self.batch_sizes.append(len(frames))
+        return [StubResult(int(frame[0, 0, 0])) for frame in frames]
+
+class StubTracker:
+    """
+    Records every frame value it sees and returns one track per frame,
+    except for values of 200 and above, which stand in for unconfirmed tracks.
+    """
+    def __init__(self):
+        self.seen = []
+
+    def update(self, det, frame):
+        value = int(det.xyxy[0, 0])
+        assert int(frame[0, 0, 0]) == value
+        self.seen.append(value)
+        if value >= 200:
+            return np.empty((0, 8))
+        return np.array([[value, 0, value + 10, 10, len(self.seen), 0.5, 3, 0]])
+
+def run_process_batch(submissions, trackers, model=None):
+    """Feeds (client_id, fill value) frames through process_batch and returns each client's replies."""
+    cids = sorted({cid for cid, _ in submissions})
+    rings = {cid: SharedFrameRing.create(slots=len(submissions), slot_bytes=8 * 8 * 3) for cid in cids}
+    pipes = {cid: mp.Pipe(duplex=False) for cid in cids}
+    responses = {cid: send for cid, (_, send) in pipes.items()}
+
+    batch = []
+    next_seq = {cid: 0 for cid in cids}
+    for cid, value in submissions:
+        seq = next_seq[cid]
+        next_seq[cid] += 1
+        shape, dtype = rings[cid].write(seq, np.full((8, 8, 3), value, dtype=np.uint8))
+        batch.append((cid, seq, seq, shape, dtype))
+
+    process_batch(model or StubModel(), batch, rings, trackers, StubTracker, responses, {})
+
+    replies = {}
+    for cid in cids:
+        recv = pipes[cid][0]
+        replies[cid] = [recv.recv() for _ in range(next_seq[cid])]
+        assert not recv.poll()
+    for ring in rings.values():
+        ring.close()
+    return replies
+
+def test_process_batch_routes_results_and_keeps_trackers_per_client():
+    trackers = {}
+    model = StubModel()
+
+    # Interleaved submissions from two clients in a single batch
+    replies = run_process_batch([(0, 10), (1, 20), (0, 11), (1, 21), (0, 12)], trackers, model)
+
+    assert model.batch_sizes == [5]
+    assert trackers[0].seen == [10, 11, 12]
+    assert trackers[1].seen == [20, 21]
+
+    for cid, expected in ((0, [10, 11, 12]), (1, [20, 21])):
+        received = replies[cid]
+        assert [m[1] for m in received] == list(range(len(expected)))
+        assert [m[2][0][2] for m in received] == expected  # x1 carries the frame value
+        assert [m[2][0][6] for m in received] == list(range(1, len(expected) + 1))  # per-client track ids
+
+def test_process_batch_matches_model_track_without_detections_or_tracks():
+    trackers = {}
+    replies = run_process_batch([(0, 0), (0, 10), (0, 0), (0, 210), (0, 11)], trackers)
+
+    # Empty frames never step the tracker, just as model.track() skips them
+    assert trackers[0].seen == [10, 210, 11]
+    rows = [m[2] for m in replies[0]]
+    assert rows[0] == [] and rows[2] == []
+    assert rows[1] == [(3, 0.5, 10, 0, 20, 10, 1)]
+    # No confirmed tracks: raw detections come back untracked instead of being dropped
+    assert rows[3] == [(3, 0.5, 210, 0, 220, 10, None)]
+    assert rows[4] == [(3, 0.5, 11, 0, 21, 10, 3)]
+
+def test_real_tracker_with_ultralytics_boxes():
+    # Guards the private ultralytics tracker API that _build_tracker relies on
+    pytest.importorskip("ultralytics")
+    from ultralytics.engine.results import Boxes
+
+    class BoxesModel:
+        def predict(self, frames, **kwargs):
+            results = []
+            for frame in frames:
+                data = [[10, 10, 40, 40, 0.9, 3]] if frame.any() else np.empty((0, 6))
+                results.append(SimpleNamespace(boxes=Boxes(np.asarray(data, dtype=np.float32), frame.shape[:2])))
+            return results
+
+    ring = SharedFrameRing.create(slots=3, slot_bytes=64 * 64 * 3)
+    recv, send = mp.Pipe(duplex=False)
+    batch = []
+    for seq, value in enumerate((1, 1, 0)):
+        shape, dtype = ring.write(seq, np.full((64, 64, 3), value, dtype=np.uint8))
+        batch.append((0, seq, seq, shape, dtype))
+
+    trackers = {}
+    process_batch(BoxesModel(), batch, {0: ring}, trackers, lambda: _build_tracker("bytetrack.yaml"),
+                  {0: send}, {})
+    replies = [recv.recv()[2] for _ in batch]
+    ring.close()
+
+    assert len(replies[0]) == 1 and len(replies[1]) == 1
+    class_id, conf, x1, y1, x2, y2, track_id = replies[1][0]
+    assert (class_id, x1, y1, x2, y2) == (3, 10, 10, 40, 40)
+    assert conf == pytest.approx(0.9)
+    assert track_id is not None and replies[0][0][6] == track_id
+    assert replies[2] == []
+
+def test_startup_failure_is_reported_to_clients(ring):
+    recv_conn, send_conn = mp.Pipe(duplex=False)
+    handle = ClientHandle(0, ring.name, ring.slots, ring.slot_bytes, queue.Queue(), recv_conn, response_timeout=5)
+    model_cfg = {"weights": "/nonexistent/weights.pt", "confidence_threshold": 0.5, "target_classes": [0]}
+
+    # Missing ultralytics or missing weights: either way the server must fail loudly
+    with pytest.raises(Exception):
+        _serve(model_cfg, {}, {0: (ring.name, ring.slots, ring.slot_bytes)}, handle.requests, {0: send_conn})
+
+    client = InferenceClient(handle)
+    with pytest.raises(RuntimeError, match="Inference server failed"):
+        client.detect_and_track(np.zeros((8, 8, 3), dtype=np.uint8))
+    client.close()
+
+def test_client_detects_dead_server(ring):
+    recv_conn, send_conn = mp.Pipe(duplex=False)
+    send_conn.close()
+    client = InferenceClient(ClientHandle(0, ring.name, ring.slots, ring.slot_bytes, queue.Queue(), recv_conn))
+    with pytest.raises(RuntimeError, match="exited unexpectedly"):
+        client.detect_and_track(np.zeros((8, 8, 3), dtype=np.uint8))
+    client.close()
+
+def test_client_times_out_on_silent_server(ring):
+    recv_conn, send_conn = mp.Pipe(duplex=False)
+    handle = ClientHandle(0, ring.name, ring.slots, ring.slot_bytes, queue.Queue(), recv_conn, response_timeout=0.05)
+    client = InferenceClient(handle)
+    with pytest.raises(TimeoutError):
+        client.detect_and_track(np.zeros((8, 8, 3), dtype=np.uint8))
+    client.close()
+    send_conn.close()
@@ -0,0 +1,121 @@
+import json
+import pytest
+from src.core.models import Detection, BoundingBox
+from src.core.rider_association import RiderAssociationEngine
+from src.tools.metrics import (
+    ClipEvaluator, GroundTruthFrame, bbox_iou, load_annotations,
+    match_detections, pareto_frontier, percentile
+)
+
+def create_detection(class_name, track_id, x1, y1, x2, y2):
+    return Detection(
+        class_id=0, class_name=class_name, confidence=0.9,
+        bbox=BoundingBox(x1=x1, y1=y1, x2=x2, y2=y2), track_id=track_id
+    )
+
+def test_bbox_iou():
+    a = BoundingBox(0, 0, 10, 10)
+    assert bbox_iou(a, a) == pytest.approx(1.0)
+    assert bbox_iou(a, BoundingBox(5, 0, 15, 10)) == pytest.approx(50 / 150)
+    assert bbox_iou(a, BoundingBox(20, 20, 30, 30)) == 0.0
+
+def test_match_requires_same_class_and_is_one_to_one():
+    gt = [create_detection("car", 1, 0, 0, 100, 100)]
+    preds = [
+        create_detection("truck", 7, 0, 0, 100, 100),
+        create_detection("car", 8, 5, 5, 100, 100),
+        create_detection("car", 9, 0, 0, 100, 100),
+    ]
+    assert match_detections(preds, gt) == [(2, 0)]
+
+def test_percentile():
+    assert percentile([], 95) == 0.0
+    assert percentile([3.0, 1.0, 2.0], 50) == 2.0
+    assert percentile([0.0, 10.0], 95) == pytest.approx(9.5)
+
+def test_evaluator_counts_detection_tracking_and_riders():
+    gt_moto = create_detection("motorcycle", 100, 100, 100, 200, 200)
+    gt_rider = create_detection("person", 200, 140, 130, 160, 170)
+    gt_frame = GroundTruthFrame(objects=[gt_moto, gt_rider], rider_pairs=[(200, 100)])
+
+    engine = RiderAssociationEngine()
+    evaluator = ClipEvaluator()
+
+    # Frame 1: both found, rider correctly associated
+    moto = create_detection("motorcycle", 1, 100, 100, 200, 200)
+    rider = create_detection("person", 2, 140, 130, 160, 170)
+    evaluator.update(gt_frame, [moto, rider], engine.associate({"motorcycles": [moto], "persons": [rider]}))
+
+    # Frame 2: motorcycle re-identified with a new track ID, spurious car, rider missed
+    moto = create_detection("motorcycle", 5, 100, 100, 200, 200)
+    car = create_detection("car", 6, 400, 400, 500, 500)
+    evaluator.update(gt_frame, [moto, car], engine.associate({"motorcycles": [moto], "persons": []}))
+
+    summary = evaluator.summary()
+    assert summary["precision"] == pytest.approx(3 / 4)
+    assert summary["recall"] == pytest.approx(3 / 4)
+    assert summary["id_switches"] == 1
+    assert summary["mota"] == pytest.approx(1 - (1 + 1 + 1) / 4)
+    assert summary["rider_precision"] == pytest.approx(1.0)
+    assert summary["rider_recall"] == pytest.approx(0.5)
+
+def test_pareto_frontier_drops_dominated_settings():
+    rows = [
+        {"fps": 10, "f1": 0.9},
+        {"fps": 20, "f1": 0.8},
+        {"fps": 15, "f1": 0.7},  # dominated by fps=20
+        {"fps": 30, "f1": 0.5},
+    ]
+    frontier = pareto_frontier(rows)
+    assert [r["fps"] for r in frontier] == [10, 20, 30]
+
+def test_load_annotations(tmp_path):
+    path = tmp_path / "clip.json"
+    path.write_text(json.dumps({"frames": {"3": [
+        {"track_id": 4, "class_name": "motorcycle", "bbox": [0, 0, 50, 50]},
+        {"track_id": 9, "class_name": "person", "bbox": [10, 10, 30, 40], "rides": 4},
+    ]}}))
+
+    frames = load_annotations(str(path))
+    assert list(frames.keys()) == [3]
+    assert len(frames[3].objects) == 2
+    assert frames[3].rider_pairs == [(9, 4)]
+
+def test_evaluator_only_scores_target_classes_and_reports_per_class():
+    gt_frame = GroundTruthFrame(objects=[
+        create_detection("motorcycle", 1, 100, 100, 200, 200),
+        create_detection("car", 2, 300, 300, 400, 400),
+    ])
+    moto = create_detection("motorcycle", 7, 100, 100, 200, 200)
+
+    evaluator = ClipEvaluator(classes=["person", "motorcycle"])
+    evaluator.update(gt_frame, [moto], {})
+    summary = evaluator.summary()
+
+    # The unrequested car is not counted as a miss
+    assert summary["recall"] == pytest.approx(1.0)
+    assert summary["recall.motorcycle"] == pytest.approx(1.0)
+    assert summary["recall.person"] == 0.0
+    assert "recall.car" not in summary
+
+    unrestricted = ClipEvaluator()
+    unrestricted.update(gt_frame, [moto], {})
+    assert unrestricted.summary()["recall"] == pytest.approx(0.5)
+    assert unrestricted.summary()["recall.car"] == 0.0
+
+def test_rider_pairs_ignore_objects_without_track_id():
+    # Two unlabelled-ID persons must not overwrite each other or satisfy a pair
+    moto_gt = create_detection("motorcycle", 1, 100, 100, 200, 200)
+    anon_a = create_detection("person", None, 140, 130, 160, 170)
+    anon_b = create_detection("person", None, 500, 500, 520, 540)
+    gt_frame = GroundTruthFrame(objects=[moto_gt, anon_a, anon_b], rider_pairs=[(None, 1)])
+
+    moto = create_detection("motorcycle", 7, 100, 100, 200, 200)
+    rider = create_detection("person", 8, 140, 130, 160, 170)
+    associations = RiderAssociationEngine().associate({"motorcycles": [moto], "persons": [rider]})
+
+    evaluator = ClipEvaluator()
+    evaluator.update(gt_frame, [moto, rider], associations)
+    summary = evaluator.summary()
+    assert summary["rider_recall"] == 0.0
+    assert summary["recall"] == pytest.approx(2 / 3)
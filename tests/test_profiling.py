@@ -0,0 +1,154 @@
+import pytest
+import itertools
+from src.tools.profiling import (
+    HeapTracker, SoakRunner, analyze_samples, detect_growth, load_samples, object_counts, read_rss
+)
+
+def make_sample(rss, traced=1000, objects=None, detect=0.02):
+    return {
+        "rss_bytes": rss,
+        "traced_bytes": traced,
+        "objects": objects or {"dict": 100},
+        "latency_p95": {"detect": detect},
+    }
+
+def test_detect_growth_flags_steady_leak():
+    leak = [100 + 2 * i for i in range(20)]
+    trend = detect_growth(leak)
+    assert trend["flagged"]
+    assert trend["slope"] == pytest.approx(2.0)
+    assert trend["monotonic_fraction"] == 1.0
+
+def test_detect_growth_ignores_flat_series_with_spike():
+    flat = [100] * 10 + [400] + [100] * 9
+    assert not detect_growth(flat)["flagged"]
+
+def test_detect_growth_ignores_sawtooth():
+    # Allocator/GC cycles: grows then drops back, no sustained trend
+    sawtooth = [100, 110, 120, 100, 110, 120, 100, 110, 120, 100, 110, 120]
+    assert not detect_growth(sawtooth)["flagged"]
+
+def test_detect_growth_needs_enough_samples():
+    assert not detect_growth([1, 2, 3])["flagged"]
+
+def test_analyze_samples_reports_leaking_series_only():
+    samples = [
+        make_sample(
+            rss=500_000_000,
+            traced=1000 + 50 * i,
+            objects={"dict": 100, "Detection": 10 + 5 * i},
+            detect=0.020 + 0.002 * i,
+        )
+        for i in range(20)
+    ]
+    metrics = {f["metric"] for f in analyze_samples(samples)}
+    assert metrics == {"traced_bytes", "objects.Detection", "latency_p95.detect"}
+
+def test_analyze_samples_skips_warmup():
+    # Large jump confined to the warm-up window must not be reported
+    samples = [make_sample(rss=100), make_sample(rss=200)] + [make_sample(rss=1000) for _ in range(10)]
+    assert analyze_samples(samples, warmup_samples=2) == []
+
+def test_peak_rss_growth_is_not_reported():
+    # getrusage peaks only ever rise; that is allocator high-water, not a leak
+    samples = [make_sample(rss=1000 + 100 * i) for i in range(20)]
+    assert {f["metric"] for f in analyze_samples(samples)} == {"rss_bytes"}
+    for sample in samples:
+        sample["rss_is_peak"] = True
+    assert analyze_samples(samples) == []
+
+def test_live_samplers():
+    rss, is_peak = read_rss()
+    assert rss > 0
+    assert isinstance(is_peak, bool)
+    counts = object_counts()
+    assert counts["dict"] > 0
+
+    tracker = HeapTracker()
+    tracker.start()
+    hoard = [bytearray(1024) for _ in range(200)]
+    sample = tracker.sample(top=3)
+    tracker.stop()
+
+    assert sample["traced_bytes"] >= 200 * 1024
+    assert len(sample["top_growth"]) <= 3
+    del hoard
+
+def test_type_appearing_after_start_with_constant_count_is_not_flagged():
+    samples = [make_sample(rss=1000, objects={"dict": 100}) for _ in range(12)]
+    samples += [make_sample(rss=1000, objects={"dict": 100, "Foo": 50}) for _ in range(8)]
+    findings = analyze_samples(samples)
+    assert findings == []
+
+def test_rare_type_leak_is_seen_among_all_types():
+    class RareLeak:
+        pass
+
+    kept = [RareLeak() for _ in range(3)]
+    assert object_counts()["RareLeak"] == 3
+    del kept
+
+class NoOpPipeline:
+    """Stands in for TrafficPipeline without allocating anything per frame."""
+    io_cfg = {}
+
+    def __init__(self):
+        self.last_stage_latency = {"detect": 0.001, "route": 0.0001, "associate": 0.0001}
+
+    def process_frame(self, frame):
+        return [], {}
+
+    def write_outputs(self, frame_index, frame, detections, associations):
+        self.last_stage_latency["output"] = 0.0005
+
+class LeakedRecord:
+    pass
+
+class LeakyPipeline(NoOpPipeline):
+    def __init__(self):
+        super().__init__()
+        self.hoard = []
+
+    def process_frame(self, frame):
+        self.hoard.append(LeakedRecord())
+        return [], {}
+
+class LeakedFrame:
+    pass
+
+class LeakyOutputPipeline(NoOpPipeline):
+    """Perception is clean; the output stage holds on to every frame it writes."""
+    def __init__(self):
+        super().__init__()
+        self.written = []
+
+    def write_outputs(self, frame_index, frame, detections, associations):
+        super().write_outputs(frame_index, frame, detections, associations)
+        self.written.append(LeakedFrame())
+
+def run_soak(pipeline, tmp_path, samples=60, sample_every=50, exercise_outputs=False):
+    path = str(tmp_path / "soak.jsonl")
+    runner = SoakRunner(pipeline, itertools.repeat(None), source_fps=1.0, sample_every=sample_every,
+                        exercise_outputs=exercise_outputs)
+    taken = runner.run(simulated_hours=samples * sample_every / 3600, samples_path=path)
+    assert taken == samples
+    return load_samples(path)
+
+def test_soak_of_noop_pipeline_reports_no_findings(tmp_path):
+    samples = run_soak(NoOpPipeline(), tmp_path)
+    assert analyze_samples(samples) == []
+
+def test_soak_of_leaking_pipeline_is_flagged(tmp_path):
+    samples = run_soak(LeakyPipeline(), tmp_path, samples=20)
+    metrics = {f["metric"] for f in analyze_samples(samples)}
+    assert "traced_bytes" in metrics
+    assert "objects.LeakedRecord" in metrics
+
+def test_soak_exercises_output_stage(tmp_path):
+    # Output-stage leaks only show up when the soak drives write_outputs() too
+    perception_only = run_soak(LeakyOutputPipeline(), tmp_path, samples=20)
+    assert "objects.LeakedFrame" not in {f["metric"] for f in analyze_samples(perception_only)}
+
+    samples = run_soak(LeakyOutputPipeline(), tmp_path, samples=20, exercise_outputs=True)
+    assert "output" in samples[-1]["latency_p95"]
+    assert "objects.LeakedFrame" in {f["metric"] for f in analyze_samples(samples)}
@@ -0,0 +1,101 @@
+import os
+import pytest
+from src.core.models import Detection, BoundingBox
+from src.core.rider_association import RiderAssociationEngine
+from src.utils.sidecar import SidecarWriter, SidecarReader, sidecar_path_for, resolve_output_mode
+
+def create_detection(class_id, class_name, track_id, x1, y1, x2, y2, conf=0.75):
+    return Detection(
+        class_id=class_id, class_name=class_name, confidence=conf,
+        bbox=BoundingBox(x1=x1, y1=y1, x2=x2, y2=y2), track_id=track_id
+    )
+
+@pytest.fixture
+def sidecar_file(tmp_path):
+    return str(tmp_path / "clip.sidecar.bin")
+
+def test_round_trip_detections_and_associations(sidecar_file):
+    moto = create_detection(3, "motorcycle", 10, 100, 100, 200, 200)
+    rider = create_detection(0, "person", None, 140, 130, 160, 170)
+    car = create_detection(2, "car", 11, 300, 300, 400, 380)
+    detections = [moto, rider, car]
+    associations = RiderAssociationEngine().associate({"motorcycles": [moto], "persons": [rider]})
+
+    with SidecarWriter(sidecar_file, fps=25, width=1920, height=1080) as writer:
+        writer.write_frame(1, detections, associations)
+        writer.write_frame(3, [], {})
+
+    reader = SidecarReader(sidecar_file)
+    assert (reader.fps, reader.width, reader.height) == (25, 1920, 1080)
+
+    frames = list(reader.frames())
+    assert [f[0] for f in frames] == [1, 3]
+
+    _, dets, assoc = frames[0]
+    assert [d.class_name for d in dets] == ["motorcycle", "person", "car"]
+    assert dets[0].bbox == moto.bbox
+    assert dets[1].track_id is None
+    assert dets[2].confidence == pytest.approx(0.75)
+    assert list(assoc.keys()) == [10]
+    assert assoc[10]["riders"] == [dets[1]]
+
+    assert frames[1][1] == [] and frames[1][2] == {}
+
+def test_motorcycle_without_riders_is_preserved(sidecar_file):
+    moto = create_detection(3, "motorcycle", 7, 0, 0, 50, 50)
+    associations = RiderAssociationEngine().associate({"motorcycles": [moto], "persons": []})
+
+    with SidecarWriter(sidecar_file, fps=30, width=640, height=480) as writer:
+        writer.write_frame(1, [moto], associations)
+
+    _, _, assoc = next(SidecarReader(sidecar_file).frames())
+    assert assoc[7]["motorcycle"].track_id == 7
+    assert assoc[7]["riders"] == []
+
+def test_truncated_trailing_record_is_ignored(sidecar_file):
+    car = create_detection(2, "car", 1, 0, 0, 10, 10)
+    with SidecarWriter(sidecar_file, fps=30, width=640, height=480) as writer:
+        writer.write_frame(1, [car], {})
+        writer.write_frame(2, [car], {})
+
+    with open(sidecar_file, "rb+") as f:
+        f.seek(-5, 2)
+        f.truncate()
+
+    frames = list(SidecarReader(sidecar_file).frames())
+    assert [f[0] for f in frames] == [1]
+
+def test_rejects_foreign_file(sidecar_file):
+    with open(sidecar_file, "wb") as f:
+        f.write(b"\x00" * 64)
+
+    with pytest.raises(ValueError):
+        SidecarReader(sidecar_file)
+
+def test_sidecar_path_for_sources():
+    assert sidecar_path_for("data/input/clip.mp4") == "data/input/clip.sidecar.bin"
+    with pytest.raises(ValueError):
+        sidecar_path_for(0)
+
+def test_live_camera_falls_back_to_video_output():
+    # Nothing stored to render a sidecar over, so live sources must keep encoding video
+    assert resolve_output_mode('sidecar', 0) == 'video'
+    assert resolve_output_mode('sidecar', "1") == 'video'
+    assert resolve_output_mode('sidecar', "data/input/clip.mp4") == 'sidecar'
+    assert resolve_output_mode('video', 0) == 'video'
+
+def test_truncated_class_record_is_ignored(sidecar_file):
+    car = create_detection(2, "car", 1, 0, 0, 10, 10)
+    bus = create_detection(5, "bus", 2, 0, 0, 10, 10)
+    with SidecarWriter(sidecar_file, fps=30, width=640, height=480) as writer:
+        writer.write_frame(1, [car], {})
+        writer._fh.flush()
+        frame_1_end = os.path.getsize(sidecar_file)
+        writer.write_frame(2, [bus], {})
+
+    # Cut inside the "bus" class-name record that precedes frame 2
+    with open(sidecar_file, "rb+") as f:
+        f.truncate(frame_1_end + 4)
+
+    frames = list(SidecarReader(sidecar_file).frames())
+    assert [f[0] for f in frames] == [1]
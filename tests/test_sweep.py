@@ -0,0 +1,122 @@
+import csv
+import json
+import time
+import pytest
+from src.core.models import Detection, BoundingBox
+from src.tools.metrics import GroundTruthFrame
+from src.tools.sweep import apply_settings, expand_grid, run_sweep, run_trial, write_report
+
+NAMES = {0: "person", 2: "car", 3: "motorcycle"}
+
+def create_detection(class_id, track_id, x1, y1, x2, y2):
+    return Detection(
+        class_id=class_id, class_name=NAMES[class_id], confidence=0.9,
+        bbox=BoundingBox(x1=x1, y1=y1, x2=x2, y2=y2), track_id=track_id
+    )
+
+class StubModel:
+    names = NAMES
+
+class StubDetector:
+    """Sees a single motorcycle in every frame; the first call stands in for model warm-up."""
+    def __init__(self, warmup_delay=0.0):
+        self.model = StubModel()
+        self.warmup_delay = warmup_delay
+        self.frames = []
+
+    def detect_and_track(self, frame):
+        if not self.frames:
+            time.sleep(self.warmup_delay)
+        self.frames.append(frame)
+        return [create_detection(3, 1, 100, 100, 200, 200)]
+
+def base_config(frame_skip=1):
+    return {
+        "model": {"weights": "unused.pt", "confidence_threshold": 0.4, "target_classes": [0, 3]},
+        "io": {"frame_skip": frame_skip},
+    }
+
+def ground_truth(frames):
+    return {
+        i: GroundTruthFrame(objects=[
+            create_detection(3, 10, 100, 100, 200, 200),
+            create_detection(2, 11, 400, 400, 500, 500),
+        ])
+        for i in range(1, frames + 1)
+    }
+
+def test_expand_grid():
+    points = expand_grid({"a": [1, 2], "b": [3]})
+    assert points == [{"a": 1, "b": 3}, {"a": 2, "b": 3}]
+
+def test_apply_settings_splits_io_and_model_keys():
+    config = base_config()
+    cfg = apply_settings(config, {"frame_skip": 3, "input_size": 480})
+    assert cfg["io"]["frame_skip"] == 3
+    assert cfg["model"]["input_size"] == 480
+    # The base config is shared by every trial and must stay untouched
+    assert config["io"]["frame_skip"] == 1
+    assert "input_size" not in config["model"]
+
+def test_write_report_takes_union_of_row_keys(tmp_path):
+    rows = [
+        {"settings": {"target_classes": [0, 3]}, "fps": 30.0, "f1.motorcycle": 0.8},
+        {"settings": {"target_classes": [2]}, "fps": 40.0, "f1.car": 0.7},
+    ]
+    write_report(rows, [rows[1]], str(tmp_path))
+
+    with open(tmp_path / "sweep_results.csv", newline='') as f:
+        reader = csv.DictReader(f)
+        table = list(reader)
+    assert reader.fieldnames == ["settings", "fps", "f1.motorcycle", "f1.car"]
+    assert json.loads(table[0]["settings"]) == {"target_classes": [0, 3]}
+    assert table[0]["f1.car"] == ""
+    assert table[1]["f1.car"] == "0.7"
+
+    with open(tmp_path / "sweep_pareto.json") as f:
+        assert json.load(f) == [rows[1]]
+
+def test_trial_scores_skipped_frames_against_last_output():
+    detector = StubDetector()
+    result = run_trial(base_config(frame_skip=2), ["f1", "f2", "f3", "f4"], ground_truth(4), detector=detector)
+
+    assert detector.frames == ["f2", "f4"]
+    assert result["frames"] == 4
+    # Frame 1 precedes the first inference; frame 3 reuses frame 2's output. The car is
+    # not a target class and must not count as missed
+    assert result["recall.motorcycle"] == pytest.approx(3 / 4)
+    assert result["precision"] == pytest.approx(1.0)
+    assert "recall.car" not in result
+
+def test_trial_fps_excludes_warmup_inference():
+    # A slow first inference must not drag down steady-state throughput
+    result = run_trial(base_config(), [f"f{i}" for i in range(1, 6)], {}, detector=StubDetector(warmup_delay=0.5))
+    assert result["fps"] > 20
+    assert result["detect_ms_p95"] < 100
+
+def test_trial_respects_max_frames():
+    detector = StubDetector()
+    result = run_trial(base_config(), ["f1", "f2", "f3"], {}, max_frames=2, detector=detector)
+    assert result["frames"] == 2
+    assert detector.frames == ["f1", "f2"]
+
+def test_sweep_builds_fresh_detector_per_trial(tmp_path):
+    annotations = tmp_path / "gt.json"
+    annotations.write_text(json.dumps({"frames": {
+        "1": [{"track_id": 10, "class_name": "motorcycle", "bbox": [100, 100, 200, 200]}]
+    }}))
+    detectors = []
+
+    def factory(cfg):
+        detectors.append(StubDetector())
+        return detectors[-1]
+
+    rows, frontier = run_sweep(
+        base_config(), "clip.mp4", str(annotations), {"confidence_threshold": [0.3, 0.5]},
+        detector_factory=factory, frame_source=lambda path: ["f1", "f2"]
+    )
+    assert [row["settings"] for row in rows] == [{"confidence_threshold": 0.3}, {"confidence_threshold": 0.5}]
+    assert len(detectors) == 2
+    assert all(d.frames == ["f1", "f2"] for d in detectors)
+    assert all(row["recall.motorcycle"] == 1.0 for row in rows)
+    assert frontier